@@ -1,6 +1,23 @@
-import itertools
 import random
-import ansi_colors as ac
+from collections import deque
+
+import numpy as np
+
+
+def _neighbor_counts(board):
+    """
+    Returns the full matrix of 3x3 neighbor sums for a boolean
+    board, excluding each cell itself: a 2D convolution with the
+    ones-kernel done as nine shifted-slice adds.
+    """
+    height, width = board.shape
+    cells = board.astype(np.int8)
+    padded = np.pad(cells, 1)
+    counts = np.zeros((height, width), dtype=np.int8)
+    for di in range(3):
+        for dj in range(3):
+            counts += padded[di:di + height, dj:dj + width]
+    return counts - cells
 
 
 class Minesweeper():
@@ -13,27 +30,35 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        self.board = np.zeros((height, width), dtype=bool)
+
+        # Add mines randomly, sampling flat indices without replacement.
+        # The board array is the single source of truth for mine
+        # placement; the mines set view is derived from it on demand.
+        idx = np.random.choice(height * width, size=mines, replace=False)
+        self.board.flat[idx] = True
+        self._mine_cells = None
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # The board never changes after placement, so the per-cell
+        # neighbor counts can be computed once up front.
+        self._nearby = _neighbor_counts(self.board)
 
         # At first, player has found no mines
         self.mines_found = set()
 
+    @property
+    def mines(self):
+        """
+        The set of (i, j) cells containing mines, derived from the
+        board and cached on first use.
+        """
+        if self._mine_cells is None:
+            self._mine_cells = {(int(i), int(j))
+                                for i, j in zip(*np.nonzero(self.board))}
+        return self._mine_cells
+
     def print(self):
         """
         Prints a text-based representation
@@ -50,8 +75,7 @@ class Minesweeper():
         print("--" * self.width + "-")
 
     def is_mine(self, cell):
-        i, j = cell
-        return self.board[i][j]
+        return bool(self.board[cell])
 
     def nearby_mines(self, cell):
         """
@@ -59,24 +83,7 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        return int(self._nearby[cell])
 
     def won(self):
         """
@@ -85,6 +92,11 @@ class Minesweeper():
         return self.mines_found == self.mines
 
 
+# Shared empty result so negative known_mines/known_safes calls
+# allocate nothing.
+_EMPTY = frozenset()
+
+
 class Sentence():
     """
     Logical statement about a Minesweeper game
@@ -92,34 +104,40 @@ class Sentence():
     and a count of the number of those cells which are mines.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
+    def __init__(self, cells, count, _own=False):
+        # _own lets internal callers hand over a freshly-built set
+        # they no longer use, skipping the defensive copy.
+        self.cells = cells if _own and isinstance(cells, set) else set(cells)
         self.count = count
-
-    def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        # Bitmask of self.cells; assigned and kept current by
+        # MinesweeperAI, which knows the board geometry.
+        self.mask = 0
+        # Cache whether the sentence is fully determined; only
+        # mark_mine/mark_safe can change this.
+        self._all_mines = len(self.cells) == count
+        self._all_safes = count == 0
 
     def __str__(self):
         return f"{self.cells} = {self.count}"
-    
+
+    def is_resolved(self):
+        """
+        True when every cell is already determined (all mines or all
+        safe), so the resolution pass will retire the sentence.
+        """
+        return self._all_mines or self._all_safes
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        if len(self.cells) == self.count:
-            return self.cells
-        else:
-            return set()
+        return self.cells if self._all_mines else _EMPTY
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
-        if self.count == 0:
-            return self.cells
-        else:
-            return set()
-
+        return self.cells if self._all_safes else _EMPTY
 
     def mark_mine(self, cell):
         """
@@ -129,6 +147,8 @@ class Sentence():
         if cell in self.cells:
             self.cells.remove(cell)
             self.count -= 1
+            self._all_mines = len(self.cells) == self.count
+            self._all_safes = self.count == 0
 
     def mark_safe(self, cell):
         """
@@ -137,6 +157,28 @@ class Sentence():
         """
         if cell in self.cells:
             self.cells.remove(cell)
+            self._all_mines = len(self.cells) == self.count
+
+    def mark_mines(self, cells):
+        """
+        Batch form of mark_mine: applies a set of cells known to be
+        mines with one intersection instead of per-cell probes.
+        """
+        overlap = self.cells & cells
+        if overlap:
+            self.cells -= overlap
+            self.count -= len(overlap)
+            self._all_mines = len(self.cells) == self.count
+            self._all_safes = self.count == 0
+
+    def mark_safes(self, cells):
+        """
+        Batch form of mark_safe for a set of cells known to be safe.
+        """
+        overlap = self.cells & cells
+        if overlap:
+            self.cells -= overlap
+            self._all_mines = len(self.cells) == self.count
 
 
 class MinesweeperAI():
@@ -153,112 +195,298 @@ class MinesweeperAI():
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
+        # Cells still eligible for a move: neither played nor a
+        # known mine. Maintained incrementally so make_random_move
+        # never rescans the board.
+        self._available = {(i, j) for i in range(height) for j in range(width)}
+
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
         self.ones = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells not yet played, so make_safe_move is O(1)
+        # instead of scanning all of self.safes.
+        self._safe_unplayed = set()
+
+        # Bitmask mirrors of the sets above, one bit per cell
+        # (bit i*width+j), so the hot paths can use integer
+        # AND/OR instead of per-cell set membership tests.
+        self._mines_bm = 0
+        self._safes_bm = 0
+        self._moves_bm = 0
+
+        # Static in-bounds neighbors of each cell, computed once so the
+        # hot paths never redo bounds arithmetic.
+        self._static_neighbors = {
+            (i, j): tuple((ni, nj)
+                          for ni in range(i - 1, i + 2)
+                          for nj in range(j - 1, j + 2)
+                          if (ni, nj) != (i, j)
+                          and 0 <= ni < height and 0 <= nj < width)
+            for i in range(height) for j in range(width)
+        }
+
+        # Precomputed mask of the in-bounds neighbors of each cell
+        self._neighbor_masks = {
+            cell: sum(self._bit(c) for c in neighbors)
+            for cell, neighbors in self._static_neighbors.items()
+        }
+
+        # Sentences about the game known to be true, keyed by a
+        # monotonically-increasing id so removal is O(1).
+        self.knowledge = {}
+        self._next_id = 0
+
+        # Index of sentences by the cells they mention, so subset
+        # inference only compares sentences sharing at least one cell.
+        # Keys are packed cell ids (i*width+j): ints hash faster and
+        # store smaller than (i, j) tuples.
+        self._index = {}     # packed cell id -> set of sentence ids
+
+        # Registry of live sentences by (cells bitmask, count), so a
+        # sentence identical to an existing one is never added twice.
+        self._dedup = {}     # (mask, count) -> sentence id
+
+        # Generation counter bumped by every fact or sentence change,
+        # so subset inference can skip passes where nothing moved.
+        self._gen = 0
+        self._last_infer_gen = -1
+
+    def _cid(self, cell):
+        """
+        Packs a cell into a single small int (i*width + j).
+        """
+        return cell[0] * self.width + cell[1]
+
+    def _bit(self, cell):
+        """
+        Returns the single-bit mask for a cell.
+        """
+        return 1 << self._cid(cell)
+
+    def _cells_from_mask(self, mask):
+        """
+        Decodes a bitmask back into a set of (i, j) cells.
+        """
+        cells = set()
+        while mask:
+            low = (mask & -mask).bit_length() - 1
+            cells.add(divmod(low, self.width))
+            mask &= mask - 1
+        return cells
+
+    def _add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and registers its cells
+        in the cell index. Returns the sentence id; if an identical
+        sentence is already present, returns that one's id instead.
+        """
+        mask = 0
+        for c in sentence.cells:
+            mask |= self._bit(c)
+        key = (mask, sentence.count)
+        dup = self._dedup.get(key)
+        if dup is not None:
+            return dup
+        sid = self._next_id
+        self._next_id += 1
+        self.knowledge[sid] = sentence
+        for c in sentence.cells:
+            self._index.setdefault(self._cid(c), set()).add(sid)
+        sentence.mask = mask
+        self._dedup[key] = sid
+        self._gen += 1
+        return sid
+
+    def _remove_sentence(self, sid):
+        """
+        Removes a sentence from the knowledge base and the cell index.
+        """
+        sentence = self.knowledge.pop(sid, None)
+        if sentence is None:
+            return
+        key = (sentence.mask, sentence.count)
+        if self._dedup.get(key) == sid:
+            del self._dedup[key]
+        for c in sentence.cells:
+            self._index.get(self._cid(c), set()).discard(sid)
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
-        self.check_knowledge(self.knowledge)
+        self._mark_mines({cell})
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
-        self.check_knowledge(self.knowledge)
+        self._mark_safes({cell})
+
+    def _mark_mines(self, cells):
+        """
+        Marks a whole set of cells as mines, touching each affected
+        sentence once instead of once per cell.
+        """
+        bits = 0
+        affected = set()
+        for cell in cells:
+            ci = self._cid(cell)
+            bits |= 1 << ci
+            self.mines.add(cell)
+            self._available.discard(cell)
+            # The cells leave every sentence, so their index entries go too.
+            affected |= self._index.pop(ci, set())
+        self._mines_bm |= bits
+        for sid in affected:
+            sentence = self.knowledge[sid]
+            old_key = (sentence.mask, sentence.count)
+            if self._dedup.get(old_key) == sid:
+                del self._dedup[old_key]
+            sentence.mark_mines(cells)
+            sentence.mask &= ~bits
+            self._dedup.setdefault((sentence.mask, sentence.count), sid)
+        self._gen += 1
+
+    def _mark_safes(self, cells):
+        """
+        Marks a whole set of cells as safe, touching each affected
+        sentence once instead of once per cell.
+        """
+        bits = 0
+        affected = set()
+        for cell in cells:
+            ci = self._cid(cell)
+            bits |= 1 << ci
+            self.safes.add(cell)
+            if cell not in self.moves_made:
+                self._safe_unplayed.add(cell)
+            # The cells leave every sentence, so their index entries go too.
+            affected |= self._index.pop(ci, set())
+        self._safes_bm |= bits
+        for sid in affected:
+            sentence = self.knowledge[sid]
+            old_key = (sentence.mask, sentence.count)
+            if self._dedup.get(old_key) == sid:
+                del self._dedup[old_key]
+            sentence.mark_safes(cells)
+            sentence.mask &= ~bits
+            self._dedup.setdefault((sentence.mask, sentence.count), sid)
+        self._gen += 1
 
     def get_nearby(self, cell):
-        nearby = set()
-        # Get adjacent cells.
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-                # Add cell if within boundaries and not a safe or a move made or a mine.
-                if (0 <= i < self.height and
-                    0 <= j < self.width and
-                    (i, j) not in self.safes and 
-                    (i, j) not in self.moves_made and
-                    (i, j) not in self.mines
-                    ):
-                    nearby.add((i, j))
-        return nearby
+        # Neighbors that are not a safe or a move made or a mine,
+        # computed with one AND over the precomputed neighbor mask.
+        nearby = self._neighbor_masks[cell] & ~(
+            self._mines_bm | self._safes_bm | self._moves_bm)
+        return self._cells_from_mask(nearby)
 
     def check_ones(self, cell):
         # Check cells adjacent to the mine.
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-                # Check cells within boundaries and count = 1.
-                if (0 <= i < self.height and
-                    0 <= j < self.width and
-                    (i, j) in self.ones
-                ):
-                    # Mark as safe all unidentified neighbors of cells with one count.
-                    for nb in self.get_nearby((i, j)):
-                        if nb != (i, j):
-                            self.mark_safe(nb)
+        for nb in self._static_neighbors[cell]:
+            # Check cells with count = 1.
+            if nb in self.ones:
+                # Mark as safe all unidentified neighbors of cells with one count.
+                for c in self.get_nearby(nb):
+                    self.mark_safe(c)
 
     def check_knowledge(self, knowledge):
-        # Check for new knowledge.
-        for sentence in knowledge:
-            # Remove sentences with no cells.
-            if len(sentence.cells) == 0:
-                knowledge.remove(sentence)
-            # Check for known safes.
-            if sentence.known_safes():
-                for c in sentence.cells.copy():
-                    self.mark_safe(c)
-                    self.check_knowledge(knowledge) 
-            # Check for known mines.
-            if sentence.known_mines():
-                for c in sentence.cells.copy():
-                    self.mark_mine(c)
-                    self.check_knowledge(knowledge)
-                    self.check_ones(c)
-                    self.check_knowledge(knowledge)
-            
-        # Check for subsets in pairs of sentences.
-        if len(knowledge) > 1:
-            combo_list = list(itertools.combinations(knowledge, 2))
-            for combo in combo_list:
-                set0 = combo[0].cells
-                count0 = combo[0].count
-                set1 = combo[1].cells
-                count1 = combo[1].count
-                if set0 and set1:
-                    if set1 < set0:
-                        knowledge.append(Sentence(set0 - set1, count0 - count1))
-                        if combo[0] in knowledge:
-                            knowledge.remove(combo[0])
-                        """ if combo[1] in knowledge:
-                            knowledge.remove(combo[1]) """
-                        self.check_knowledge(knowledge) 
-                    elif set0 < set1:
-                        knowledge.append(Sentence(set1 - set0, count1 - count0))
-                        """ if combo[0] in knowledge:
-                            knowledge.remove(combo[0]) """
-                        if combo[1] in knowledge:
-                            knowledge.remove(combo[1])
-                        self.check_knowledge(knowledge)    
-            
+        """
+        Drains every consequence of the current knowledge base:
+        resolves fully-determined sentences, applies the resulting
+        safe/mine facts, and runs subset inference, iterating until
+        nothing changes. No step recurses.
+        """
+        while True:
+            # Check for new knowledge.
+            new_safes = set()
+            new_mines = set()
+            for sid in list(knowledge):
+                sentence = knowledge[sid]
+                # Remove sentences with no cells.
+                if len(sentence.cells) == 0:
+                    self._remove_sentence(sid)
+                    continue
+                # Check for known safes.
+                if sentence.known_safes():
+                    new_safes |= sentence.cells
+                # Check for known mines.
+                elif sentence.known_mines():
+                    new_mines |= sentence.cells
+
+            # Apply the facts in batches; marking shrinks sentences,
+            # which the next resolution pass picks up.
+            new_safes -= self.safes
+            new_mines -= self.mines
+            if new_mines:
+                self._mark_mines(new_mines)
+                for cell in new_mines:
+                    self.check_ones(cell)
+            if new_safes:
+                self._mark_safes(new_safes)
+            if new_safes or new_mines:
+                continue
+
+            # Check for subsets; stop once inference adds nothing new.
+            if not self._infer_subsets():
+                break
+
+    def _infer_subsets(self):
+        """
+        Runs subset inference among sentences sharing at least one
+        cell. Returns True if any new sentence was derived.
+        """
+        # Nothing marked or added since the last pass: already converged.
+        if self._gen == self._last_infer_gen:
+            return False
+
+        added = False
+        worklist = deque(self.knowledge)
+        while worklist:
+            sid = worklist.popleft()
+            sentence = self.knowledge.get(sid)
+            # Resolved sentences are about to be retired by the
+            # resolution pass; pairing with them is redundant work.
+            if sentence is None or not sentence.cells or sentence.is_resolved():
+                continue
+            # Candidate sentences overlapping this one.
+            candidates = set()
+            for c in sentence.cells:
+                candidates |= self._index.get(self._cid(c), set())
+            candidates.discard(sid)
+            for oid in candidates:
+                other = self.knowledge.get(oid)
+                if other is None or not other.cells or other.is_resolved():
+                    continue
+                # A strict subset needs strictly fewer cells and no
+                # more mines; the length/count checks reject most
+                # pairs before the single-AND mask subset test.
+                ls, lo = len(sentence.cells), len(other.cells)
+                if ls == lo:
+                    continue
+                ms, mo = sentence.mask, other.mask
+                if (ls < lo and sentence.count <= other.count
+                        and ms & ~mo == 0):
+                    # Replace the superset with what it adds to the subset.
+                    new = Sentence(other.cells - sentence.cells,
+                                   other.count - sentence.count, _own=True)
+                    worklist.append(self._add_sentence(new))
+                    self._remove_sentence(oid)
+                    added = True
+                elif (lo < ls and other.count <= sentence.count
+                        and mo & ~ms == 0):
+                    new = Sentence(sentence.cells - other.cells,
+                                   sentence.count - other.count, _own=True)
+                    worklist.append(self._add_sentence(new))
+                    self._remove_sentence(sid)
+                    added = True
+                    # This sentence is gone; stop comparing against it.
+                    break
+        self._last_infer_gen = self._gen
+        return added
 
     def add_knowledge(self, cell, count):
         """
@@ -276,27 +504,24 @@ class MinesweeperAI():
                if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell)
+        self._moves_bm |= self._bit(cell)
+        self._available.discard(cell)
+        self._safe_unplayed.discard(cell)
         self.mark_safe(cell)
 
         if count == 1:
             self.ones.add(cell)
 
-        # Count mines in neighbors of cell.
-        mine_count = 0
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-                # Count mines within boundaries.
-                if (0 <= i < self.height and
-                    0 <= j < self.width and
-                    (i, j) in self.mines):
-                    mine_count +=1
+        # Count known mines among the neighbors: one AND plus a popcount.
+        mine_count = (self._neighbor_masks[cell] & self._mines_bm).bit_count()
         # Create new sentence.
-        if self.get_nearby(cell):
-            self.knowledge.append(Sentence(self.get_nearby(cell), count - mine_count))
-            self.check_knowledge(self.knowledge)
+        nearby = self.get_nearby(cell)
+        if nearby:
+            self._add_sentence(Sentence(nearby, count - mine_count, _own=True))
+
+        # Marking the cell safe and/or adding the sentence may have
+        # consequences; drain them all.
+        self.check_knowledge(self.knowledge)
 
     def make_safe_move(self):
         """
@@ -308,11 +533,7 @@ class MinesweeperAI():
         and self.moves_made, but should not modify any of those values.
         """
         # Use a safe cell, if available and not previously used for a move.
-        if self.safes:
-            for c in self.safes:
-                if c not in self.moves_made:
-                    return c
-        return None
+        return next(iter(self._safe_unplayed), None)
 
     def make_random_move(self):
         """
@@ -321,14 +542,7 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        choices = []
-        # List the cells that can be used for a move.
-        for i in range(self.height):
-            for j in range(self.width):
-                if  (i, j) not in self.moves_made and (i, j) not in self.mines:
-                    choices.append((i, j))
-        # Randomly choose one of the cells.
-        if len(choices) > 0:
-            return random.choice(choices)
-        else:
-            return None
+        # Randomly choose one of the maintained candidate cells.
+        if self._available:
+            return random.choice(sorted(self._available))
+        return None
@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+HEIGHT = 8
+WIDTH = 8
+MINES = 8
+
+
+def _play_one(seed):
+    """
+    Plays a single AI-only game to completion.
+    Returns (won, moves_made) for the game.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
+    ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+    moves = 0
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None:
+            # No cells left to play; the AI wins if it flagged every mine.
+            return ai.mines == game.mines, moves
+        if game.is_mine(move):
+            return False, moves
+        ai.add_knowledge(move, game.nearby_mines(move))
+        moves += 1
+
+
+def play_many(n_games, workers=None):
+    """
+    Plays n_games independent games across worker processes and
+    returns the list of (won, moves_made) results. Games are
+    independent, so scaling is near-linear in core count.
+    """
+    if workers is None:
+        workers = os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_play_one, range(n_games)))
+
+
+if __name__ == "__main__":
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    start = time.time()
+    results = play_many(n_games, workers)
+    elapsed = time.time() - start
+    wins = sum(1 for won, _ in results if won)
+    print(f"{wins}/{n_games} games won in {elapsed:.2f}s")
@@ -4,7 +4,7 @@ def print_ai_status():
     print(f'\nAfter move:{move} with nearby_count:{nearby_count}')
     if ai.knowledge:
         print('Sentences in Knowledge Base:')
-        for cnt, s in enumerate(ai.knowledge):
+        for cnt, s in enumerate(ai.knowledge.values()):
             #print(f'S#{cnt}: {s}')
             # create list from cell set with moves ordered by row/column
             s_as_l = sorted(list(s.cells), key=lambda t: (t[0], t[1]))